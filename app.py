@@ -1,14 +1,25 @@
 from flask import Flask, render_template, request, jsonify, send_file # type: ignore
-import subprocess
+from playwright.sync_api import sync_playwright
+from concurrent.futures import ThreadPoolExecutor
 import os
-import json
-import time
 import threading
 from datetime import datetime
-import csv
+
+import maps_scraper
+from rate_limiter import RateLimiter, MAPS_TARGET
+from session_pool import SessionPool
 
 app = Flask(__name__)
 
+# Rate budget shared with any CLI scraper processes running alongside the UI
+RATE_STATE_FILE = os.path.join("checkpoints", "rate_limits.json")
+
+# Warm browser sessions, kept between scrapes. Playwright's sync API is not
+# thread-safe, so all browser work runs on this single dedicated thread.
+session_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+session_pools = {}
+playwright = None
+
 # Status tracking
 scraper_status = {
     "running": False,
@@ -17,7 +28,8 @@ scraper_status = {
     "total_businesses": 0,
     "message": "Ready",
     "results": None,
-    "error": None
+    "error": None,
+    "session_stats": None
 }
 
 @app.route('/')
@@ -54,7 +66,8 @@ def start_scrape():
         "total_businesses": 0,
         "message": "Starting scraper...",
         "results": None,
-        "error": None
+        "error": None,
+        "session_stats": None
     }
     
     # Start scraper in background thread
@@ -67,62 +80,71 @@ def start_scrape():
     
     return jsonify({"status": "started"})
 
+def update_progress(done, total, name):
+    scraper_status["current_business"] = name
+    scraper_status["progress"] = 10 + 65 * done // max(total, 1)
+    scraper_status["message"] = f"🔍 Scraped {done}/{total}: {name}"
+
+def scrape_in_session(keyword, city, max_results, no_emails, headless, timeout):
+    """Run one scrape on a pooled browser page (session thread only)"""
+    global playwright
+    
+    if playwright is None:
+        playwright = sync_playwright().start()
+    
+    if headless not in session_pools:
+        session_pools[headless] = SessionPool(
+            playwright.chromium,
+            headless=headless,
+            storage_state_file=maps_scraper.STORAGE_STATE_FILE,
+            timeout=maps_scraper.SEARCH_TIMEOUT
+        )
+    pool = session_pools[headless]
+    
+    # One limiter per scrape so its summary covers this run only; the shared
+    # budget still lives in RATE_STATE_FILE
+    limiter = RateLimiter(
+        default_rate=maps_scraper.WEBSITE_RATE,
+        rates={MAPS_TARGET: maps_scraper.MAPS_RATE},
+        min_rate=maps_scraper.MIN_RATE,
+        max_rate=maps_scraper.MAX_RATE,
+        state_file=RATE_STATE_FILE
+    )
+    pool.limiter = limiter
+    
+    with pool.session() as page:
+        scraper_status["message"] = "🔍 Searching Google Maps..."
+        scraper_status["progress"] = 10
+        businesses = maps_scraper.scrape(
+            page,
+            keyword,
+            city,
+            max_results=int(max_results) if max_results else None,
+            skip_emails=no_emails,
+            timeout=int(timeout),
+            limiter=limiter,
+            on_progress=update_progress
+        )
+    
+    return businesses, pool.stats()
+
 def run_scraper(keyword, city, max_results, no_emails, headless, timeout):
     global scraper_status
     
     try:
-        # Build command
-        cmd = [
-            "python",
-            "maps_scraper.py",
-            "--keyword", keyword,
-            "--city", city,
-            "--verbose",
-            "--timeout", str(timeout)
-        ]
-        
-        if headless:
-            cmd.append("--headless")
-        
-        if max_results:
-            cmd.extend(["--max-results", str(max_results)])
-        
-        if no_emails:
-            cmd.append("--no-emails")
-        
-        scraper_status["message"] = "🚀 Launching browser..."
+        scraper_status["message"] = "🚀 Getting browser session..."
         scraper_status["progress"] = 5
         
-        # Run scraper
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__))
-        )
-        
-        scraper_status["progress"] = 75
-        scraper_status["message"] = "📊 Processing results..."
-        
-        if result.returncode != 0:
-            scraper_status["error"] = result.stderr or "Scraper failed"
-            scraper_status["running"] = False
-            return
-        
-        # Load results
-        csv_file = os.path.join("output", "businesses.csv")
-        json_file = os.path.join("output", "businesses.json")
-        
-        results = []
-        if os.path.exists(csv_file):
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                results = list(reader)
+        # Run scraper on the browser thread
+        results, session_stats = session_executor.submit(
+            scrape_in_session, keyword, city, max_results, no_emails, headless, timeout
+        ).result()
         
         scraper_status["progress"] = 100
         scraper_status["message"] = f"✅ Complete! Found {len(results)} businesses"
         scraper_status["results"] = results
         scraper_status["total_businesses"] = len(results)
+        scraper_status["session_stats"] = session_stats
         scraper_status["running"] = False
         
     except Exception as e:
@@ -0,0 +1,99 @@
+"""
+Throughput and peak-memory benchmarks for the scraper's pure-Python data path.
+
+Run with:
+    python -m pytest benchmarks/bench_data_path.py
+    BENCH_MAX_RECORDS=1000000 python -m pytest benchmarks/bench_data_path.py
+"""
+
+import os
+
+import pytest
+
+from bench_datasets import BENCH_SIZES, make_businesses, make_emails, make_pages, make_phones
+from maps_scraper import (
+    deduplicate_businesses,
+    export_businesses,
+    extract_emails_from_text,
+    load_checkpoint,
+    normalize_phone,
+    save_checkpoint,
+    validate_email,
+)
+
+
+@pytest.mark.parametrize("records", BENCH_SIZES)
+def test_extract_emails_from_text(benchmark, records):
+    pages = make_pages(records)
+
+    def run():
+        for page in pages:
+            extract_emails_from_text(page)
+
+    benchmark("extract_emails_from_text", records, run)
+
+
+@pytest.mark.parametrize("records", BENCH_SIZES)
+def test_validate_email(benchmark, records):
+    emails = make_emails(records)
+
+    def run():
+        for email in emails:
+            validate_email(email)
+
+    benchmark("validate_email", records, run)
+
+
+@pytest.mark.parametrize("records", BENCH_SIZES)
+def test_normalize_phone(benchmark, records):
+    phones = make_phones(records)
+
+    def run():
+        for phone in phones:
+            normalize_phone(phone)
+
+    benchmark("normalize_phone", records, run)
+
+
+@pytest.mark.parametrize("records", BENCH_SIZES)
+def test_deduplicate_businesses(benchmark, records):
+    businesses = make_businesses(records)
+    # deduplicate_businesses merges emails in place, so each run gets fresh dicts
+    benchmark(
+        "deduplicate_businesses",
+        records,
+        deduplicate_businesses,
+        setup=lambda: ([dict(b) for b in businesses],)
+    )
+
+
+@pytest.mark.parametrize("records", BENCH_SIZES)
+def test_save_checkpoint(benchmark, records, tmp_path):
+    businesses = make_businesses(records)
+    checkpoint_file = str(tmp_path / "checkpoint.json")
+    benchmark(
+        "save_checkpoint",
+        records,
+        lambda: save_checkpoint(checkpoint_file, businesses, records)
+    )
+
+
+@pytest.mark.parametrize("records", BENCH_SIZES)
+def test_load_checkpoint(benchmark, records, tmp_path):
+    checkpoint_file = str(tmp_path / "checkpoint.json")
+    save_checkpoint(checkpoint_file, make_businesses(records), records)
+    benchmark("load_checkpoint", records, lambda: load_checkpoint(checkpoint_file))
+    assert load_checkpoint(checkpoint_file)["businesses_count"] == records
+
+
+@pytest.mark.parametrize("records", BENCH_SIZES)
+def test_export_businesses(benchmark, records, tmp_path):
+    businesses = make_businesses(records)
+    csv_file = str(tmp_path / "businesses.csv")
+    json_file = str(tmp_path / "businesses.json")
+    benchmark(
+        "export_businesses",
+        records,
+        lambda: export_businesses(businesses, csv_file, json_file)
+    )
+    assert os.path.getsize(json_file) > 0
@@ -0,0 +1,78 @@
+"""
+Synthetic pages and business datasets for the benchmarks
+"""
+
+import os
+import random
+import string
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+MAX_RECORDS = int(os.environ.get("BENCH_MAX_RECORDS", 10_000))
+BENCH_SIZES = [size for size in SIZES if size <= MAX_RECORDS]
+
+
+def _word(rng, length=8):
+    return "".join(rng.choices(string.ascii_lowercase, k=length))
+
+
+def make_emails(n, seed=1):
+    """Mix of valid, placeholder and malformed addresses"""
+    rng = random.Random(seed)
+    emails = []
+    for i in range(n):
+        kind = i % 10
+        if kind == 0:
+            emails.append(f"test@{_word(rng)}.com")
+        elif kind == 1:
+            emails.append(f"{_word(rng)}@{_word(rng)}")
+        else:
+            emails.append(f"{_word(rng)}.{_word(rng, 4)}@{_word(rng)}.{rng.choice(['com', 'org', 'co.uk'])}")
+    return emails
+
+
+def make_phones(n, seed=2):
+    rng = random.Random(seed)
+    formats = ["(212) {}-{}", "+1 212-{}-{}", "212.{}.{}", "N/A"]
+    return [
+        rng.choice(formats).format(rng.randint(100, 999), rng.randint(1000, 9999))
+        for _ in range(n)
+    ]
+
+
+def make_pages(n, per_page=50, seed=3):
+    """HTML pages holding n contact snippets in total"""
+    rng = random.Random(seed)
+    pages = []
+    snippets = []
+    for i in range(n):
+        snippets.append(
+            f'<div class="contact"><p>{_word(rng)} {_word(rng)}</p>'
+            f'<a href="mailto:{_word(rng)}@{_word(rng)}.com">Email us</a></div>'
+        )
+        if len(snippets) == per_page or i == n - 1:
+            pages.append("<html><body>" + "".join(snippets) + "</body></html>")
+            snippets = []
+    return pages
+
+
+def make_businesses(n, duplicate_ratio=0.1, seed=4):
+    """Business dicts shaped like scraper output, with some duplicates"""
+    from maps_scraper import BUSINESS_FIELDS
+
+    rng = random.Random(seed)
+    unique = max(1, int(n * (1 - duplicate_ratio)))
+    businesses = []
+    for i in range(n):
+        j = i if i < unique else rng.randrange(unique)
+        business = {field: "N/A" for field in BUSINESS_FIELDS}
+        business.update({
+            "name": f"Business {j} {_word(random.Random(j), 6)}",
+            "address": f"{j} Main St, Springfield",
+            "phone": f"(555) {j % 1000:03d}-{j % 10000:04d}" if j % 5 else "N/A",
+            "website": f"https://business{j}.example.com" if j % 3 else "N/A",
+            "emails": f"info@business{j}.example.com" if j % 4 == 0 else "N/A",
+            "rating": round(3 + (j % 20) / 10, 1),
+            "reviews": j % 5000,
+        })
+        businesses.append(business)
+    return businesses
@@ -0,0 +1,141 @@
+"""
+Benchmark harness for the pure-Python data path.
+
+Each benchmark measures throughput (records/s, best of at least BENCH_ROUNDS
+runs, repeated until BENCH_MIN_TIME seconds are spent) and peak memory
+(tracemalloc, one separate run) and compares them with the stored baseline for
+the same function and dataset size. A benchmark fails when throughput drops,
+or peak memory grows, by more than BENCH_THRESHOLD. Runs faster than
+BENCH_MIN_RUN seconds are too noisy for a throughput gate and only check memory.
+
+Environment:
+    BENCH_MAX_RECORDS  largest dataset size to run (default 10000, up to 1000000)
+    BENCH_THRESHOLD    allowed regression as a fraction (default 0.25)
+    BENCH_ROUNDS       minimum timed runs per benchmark (default 3)
+    BENCH_MIN_TIME     seconds of timed runs per benchmark (default 1.0)
+    BENCH_MIN_RUN      shortest run whose throughput is gated (default 0.01)
+    BENCH_SAVE=1       record this run's results as the baselines
+
+Benchmarks without a baseline are skipped until one is recorded with
+BENCH_SAVE=1. Baselines are machine specific, so benchmarks/baselines.json is
+not committed.
+"""
+
+import gc
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", 0.25))
+ROUNDS = int(os.environ.get("BENCH_ROUNDS", 3))
+MIN_TIME = float(os.environ.get("BENCH_MIN_TIME", 1.0))
+MIN_RUN = float(os.environ.get("BENCH_MIN_RUN", 0.01))
+SAVE = os.environ.get("BENCH_SAVE") == "1"
+# Ignore memory differences below this many bytes (allocator noise)
+MEMORY_SLACK = 64 * 1024
+
+_results = {}
+
+
+def _load_baselines():
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+@pytest.fixture(scope="session")
+def baselines():
+    stored = _load_baselines()
+    yield stored
+    if not SAVE:
+        return
+    stored.update(_results)
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def quiet_scraper_logs():
+    logging.getLogger("maps_scraper").setLevel(logging.WARNING)
+
+
+@pytest.fixture
+def benchmark(baselines):
+    """benchmark(name, records, fn, setup=None): time fn(*setup()) and check baseline"""
+
+    def run(name, records, fn, setup=None):
+        setup = setup or (lambda: ())
+
+        best = float("inf")
+        rounds = 0
+        spent = 0.0
+        while rounds < ROUNDS or spent < MIN_TIME:
+            args = setup()
+            # Like timeit, keep collector pauses out of the timings
+            gc.disable()
+            try:
+                started = time.perf_counter()
+                fn(*args)
+                elapsed = time.perf_counter() - started
+            finally:
+                gc.enable()
+            best = min(best, elapsed)
+            spent += elapsed
+            rounds += 1
+
+        args = setup()
+        tracemalloc.start()
+        try:
+            fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = {
+            "records_per_second": round(records / best if best else float("inf"), 1),
+            "peak_memory_bytes": peak,
+        }
+        key = f"{name}[{records}]"
+        _results[key] = result
+
+        if SAVE:
+            return result
+        baseline = baselines.get(key)
+        if not baseline:
+            pytest.skip(f"no baseline for {key}, record one with BENCH_SAVE=1")
+
+        if best >= MIN_RUN:
+            floor = baseline["records_per_second"] * (1 - THRESHOLD)
+            assert result["records_per_second"] >= floor, (
+                f"{key} throughput regressed: {result['records_per_second']:.0f}/s "
+                f"vs baseline {baseline['records_per_second']:.0f}/s"
+            )
+        ceiling = baseline["peak_memory_bytes"] * (1 + THRESHOLD) + MEMORY_SLACK
+        assert result["peak_memory_bytes"] <= ceiling, (
+            f"{key} peak memory regressed: {result['peak_memory_bytes']} B "
+            f"vs baseline {baseline['peak_memory_bytes']} B"
+        )
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.write_sep("=", "benchmark results")
+    for key, result in sorted(_results.items()):
+        terminalreporter.write_line(
+            f"{key:<40} {result['records_per_second']:>14,.0f} records/s "
+            f"{result['peak_memory_bytes'] / (1024 * 1024):>10.2f} MB peak"
+        )
@@ -0,0 +1,204 @@
+"""
+Structured place data from Google Maps network responses.
+
+Instead of clicking every card and reading the rendered details panel, listen
+to the search (`/search?tbm=map`) and place-detail (`/maps/preview/place`)
+responses the page already downloads and parse every listed place in bulk.
+When cards are clicked anyway (DOM extraction), the place-detail responses
+fill the fields the details panel doesn't show.
+
+The payloads are positional JSON arrays behind an XSSI prefix. Place records
+are located by shape (a title at PLACE_NAME and coordinates at
+PLACE_COORDINATES) so changes to the wrapping structure don't break parsing;
+the field indices below are the only format-specific part.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_URL_MARKERS = ("tbm=map", "/maps/preview/place")
+XSSI_PREFIX = ")]}'"
+
+# Field positions inside a place record
+PLACE_NAME = (11,)
+PLACE_COORDINATES = (9,)  # [_, _, lat, lng]
+PLACE_ADDRESS = (39,)
+PLACE_ADDRESS_LINES = (2,)
+PLACE_PHONE = (178, 0, 0)
+PLACE_WEBSITE = (7, 0)
+PLACE_RATING = (4, 7)
+PLACE_REVIEWS = (4, 8)
+PLACE_CATEGORIES = (13,)
+PLACE_ID = (78,)
+
+
+def _dig(obj: Any, *path: int) -> Any:
+    """Follow list indices, returning None on any miss"""
+    for key in path:
+        if not isinstance(obj, list) or key >= len(obj):
+            return None
+        obj = obj[key]
+    return obj
+
+
+def _decode(text: str) -> Any:
+    """Decode a payload, unwrapping XSSI prefixes and {"d": "..."} envelopes"""
+    text = text.strip()
+    if text.endswith('/*""*/'):
+        text = text[:-6]
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    data = json.loads(text)
+    if isinstance(data, dict) and isinstance(data.get("d"), str):
+        return _decode(data["d"])
+    return data
+
+
+def _is_place(node: Any) -> bool:
+    return (
+        isinstance(node, list)
+        and isinstance(_dig(node, *PLACE_NAME), str)
+        and isinstance(_dig(node, *PLACE_COORDINATES, 2), (int, float))
+    )
+
+
+def _find_places(data: Any) -> Iterator[list]:
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, list):
+            continue
+        if _is_place(node):
+            yield node
+            continue
+        stack.extend(reversed(node))
+
+
+def _text(value: Any) -> str:
+    return value.strip() if isinstance(value, str) and value.strip() else "N/A"
+
+
+def _website(value: Any) -> str:
+    """Website URL, unwrapping Google's /url?q= redirects"""
+    if not isinstance(value, str) or not value:
+        return "N/A"
+    if value.startswith("/url?"):
+        value = parse_qs(urlparse(value).query).get("q", [value])[0]
+    return value
+
+
+def place_from_record(record: list) -> Dict:
+    """Convert a positional place record to a business dict"""
+    address = _dig(record, *PLACE_ADDRESS)
+    if not isinstance(address, str):
+        lines = _dig(record, *PLACE_ADDRESS_LINES)
+        address = ", ".join(line for line in lines if isinstance(line, str)) if isinstance(lines, list) else None
+    categories = _dig(record, *PLACE_CATEGORIES)
+    rating = _dig(record, *PLACE_RATING)
+    reviews = _dig(record, *PLACE_REVIEWS)
+    longitude = _dig(record, *PLACE_COORDINATES, 3)
+
+    return {
+        "name": _text(_dig(record, *PLACE_NAME)),
+        "address": _text(address),
+        "phone": _text(_dig(record, *PLACE_PHONE)),
+        "website": _website(_dig(record, *PLACE_WEBSITE)),
+        "emails": "N/A",
+        "latitude": _dig(record, *PLACE_COORDINATES, 2),
+        "longitude": longitude if isinstance(longitude, (int, float)) else "N/A",
+        "rating": rating if isinstance(rating, (int, float)) else "N/A",
+        "reviews": reviews if isinstance(reviews, int) else "N/A",
+        "category": _text(categories[0]) if isinstance(categories, list) and categories else "N/A",
+        "place_id": _text(_dig(record, *PLACE_ID)),
+    }
+
+
+def _fill_gaps(target: Dict, source: Dict):
+    """Copy source values into the fields target is missing"""
+    for field, value in source.items():
+        if target.get(field) in (None, "N/A") and value not in (None, "N/A"):
+            target[field] = value
+
+
+def parse_places(text: str) -> List[Dict]:
+    """Parse all places from a search or place-detail response body"""
+    try:
+        data = _decode(text)
+    except ValueError:
+        return []
+    return [place_from_record(record) for record in _find_places(data)]
+
+
+class ResponseCapture:
+    """Collect places from a page's Maps responses while attached"""
+
+    def __init__(self, page=None):
+        self.page = page
+        self.responses = 0
+        self.errors = 0
+        self._places: Dict[Any, Dict] = {}
+        self._by_name: Dict[str, List[Any]] = {}
+        self._listening = None
+
+    def __enter__(self):
+        self.attach(self.page)
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+        return False
+
+    def attach(self, page):
+        """Start listening to page (a recycled page replaces the old one)"""
+        self.detach()
+        self.page = page
+        if page is not None:
+            page.on("response", self._on_response)
+            self._listening = page
+
+    def detach(self):
+        if self._listening is not None:
+            self._listening.remove_listener("response", self._on_response)
+            self._listening = None
+
+    def _on_response(self, response):
+        if not any(marker in response.url for marker in CAPTURE_URL_MARKERS):
+            return
+        try:
+            self.add_payload(response.text())
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Could not read Maps response {response.url}: {e}")
+
+    def add_payload(self, text: str):
+        """Merge the places found in one response body"""
+        self.responses += 1
+        for place in parse_places(text):
+            key = place["place_id"] if place["place_id"] != "N/A" else (place["name"], place["address"])
+            existing = self._places.get(key)
+            if existing is None:
+                self._places[key] = place
+                self._by_name.setdefault(place["name"].lower(), []).append(key)
+                continue
+            # Detail payloads fill gaps left by search payloads
+            _fill_gaps(existing, place)
+
+    def fill(self, business: Dict) -> Dict:
+        """Fill gaps in a business read from the DOM with its captured place data"""
+        keys = self._by_name.get(business["name"].lower(), [])
+        matches = [self._places[key] for key in keys]
+        if len(matches) > 1:
+            # Same name at several locations: only trust an address match
+            matches = [p for p in matches if p["address"] == business.get("address")]
+        if len(matches) == 1:
+            _fill_gaps(business, matches[0])
+        return business
+
+    def places(self, limit: Optional[int] = None) -> List[Dict]:
+        """Captured places in the order they were listed"""
+        places = list(self._places.values())
+        return places[:limit] if limit else places
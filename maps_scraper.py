@@ -1,4 +1,3 @@
-from playwright.sync_api import sync_playwright
 import time
 import csv
 import os
@@ -7,15 +6,21 @@ import re
 import json
 import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Set
+from typing import Optional, List, Dict, Set, Iterable, Iterator
 from urllib.parse import urlparse
 
+from rate_limiter import RateLimiter, ThrottledError, MAPS_TARGET, target_for_url, is_throttled
+from session_pool import SessionPool, MAPS_URL, process_tree_rss_mb
+from maps_network import ResponseCapture
+from spill_store import SpillStore
+
 # ============================================
 # CONFIGURATION & CONSTANTS
 # ============================================
 LOG_DIR = "logs"
 CHECKPOINT_DIR = "checkpoints"
 OUTPUT_DIR = "output"
+STORAGE_STATE_FILE = os.path.join(CHECKPOINT_DIR, "storage_state.json")
 
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(CHECKPOINT_DIR, exist_ok=True)
@@ -51,6 +56,12 @@ BUSINESS_NAME_SELECTORS = [
 ]
 BUSINESS_CARD_SELECTOR = 'a[href*="/place/"]'
 
+# Output fields (network extraction fills the extra place data)
+BUSINESS_FIELDS = [
+    "name", "address", "phone", "website", "emails",
+    "latitude", "longitude", "rating", "reviews", "category", "place_id"
+]
+
 # Timeouts (in milliseconds)
 SEARCH_TIMEOUT = 60000
 BUSINESS_LOAD_TIMEOUT = 8000
@@ -64,11 +75,16 @@ SKIP_EMAIL_DOMAINS = {
     'maps.google.com'
 }
 
-# Rate limiting
-DELAY_BETWEEN_REQUESTS = 1  # seconds
-DELAY_BETWEEN_BUSINESS = 2  # seconds
+# Rate limiting (token buckets, requests per second per target)
+MAPS_RATE = 0.5
+WEBSITE_RATE = 1.0
+MIN_RATE = 0.05
+MAX_RATE = 2.0
 DELAY_BETWEEN_SCROLL = 1.5  # seconds
-DELAY_AFTER_EMAIL_EXTRACTION = 1.5  # seconds
+
+# Memory-bounded runs
+MEMORY_CHECK_INTERVAL = 10  # records between RSS checks
+RSS_HEADROOM_MB = 256  # added to the ceiling when recycling can't get under it
 
 # Retry settings
 MAX_RETRIES = 3
@@ -132,11 +148,24 @@ def get_selector(page, selectors: List[str]):
             continue
     return None
 
-def retry_action(action, max_retries: int = MAX_RETRIES, delay: float = RETRY_DELAY):
-    """Retry an action with exponential backoff"""
+def retry_action(action, max_retries: int = MAX_RETRIES, delay: float = RETRY_DELAY,
+                 limiter: Optional[RateLimiter] = None, target: str = MAPS_TARGET):
+    """Retry an action with exponential backoff (the limiter's adaptive backoff on ThrottledError)"""
     for attempt in range(max_retries):
         try:
             return action()
+        except ThrottledError as e:
+            if limiter:
+                limiter.report(target, throttled=True)
+            if attempt == max_retries - 1:
+                raise
+            if limiter:
+                wait = limiter.acquire(target)
+                logger.warning(f"Attempt {attempt + 1} throttled: {e}. Retried after {wait:.1f}s")
+                continue
+            logger.warning(f"Attempt {attempt + 1} throttled: {e}. Retrying in {delay}s...")
+            time.sleep(delay)
+            delay *= 1.5
         except Exception as e:
             if attempt == max_retries - 1:
                 raise
@@ -168,14 +197,30 @@ def load_checkpoint(checkpoint_file: str) -> Optional[Dict]:
             logger.warning(f"Could not load checkpoint: {e}")
     return None
 
+def save_places(places_file: str, places: List[Dict]):
+    """Save the captured place list checkpoint indexes refer to (written once per run)"""
+    with open(places_file, "w", encoding="utf-8") as f:
+        json.dump(places, f, ensure_ascii=False)
+
+def load_places(places_file: str) -> List[Dict]:
+    """Load the place list saved by save_places"""
+    if os.path.exists(places_file):
+        try:
+            with open(places_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load saved places: {e}")
+    return []
+
+def business_key(business: Dict) -> tuple:
+    """Composite dedup key: normalized name + normalized phone"""
+    return (business["name"].lower().strip(), normalize_phone(business["phone"]))
+
 def deduplicate_businesses(businesses: List[Dict]) -> List[Dict]:
     """Deduplicate businesses with better matching"""
     seen = {}
     for business in businesses:
-        # Create composite key: normalized name + normalized phone
-        name_key = business["name"].lower().strip()
-        phone_key = normalize_phone(business["phone"])
-        key = (name_key, phone_key)
+        key = business_key(business)
         
         # If key exists, merge emails
         if key in seen:
@@ -190,288 +235,486 @@ def deduplicate_businesses(businesses: List[Dict]) -> List[Dict]:
     
     return list(seen.values())
 
+def iter_deduplicated(store: SpillStore) -> Iterator[Dict]:
+    """Stream deduplicated businesses from a spill store"""
+    for group in store.groups():
+        yield deduplicate_businesses(group)[0]
+
+def export_businesses(businesses: Iterable[Dict], csv_file: str, json_file: str) -> Dict:
+    """Stream businesses to CSV and JSON, returning summary counts and a sample"""
+    summary = {"total": 0, "with_phone": 0, "with_website": 0, "with_email": 0, "sample": []}
+    with open(csv_file, "w", newline="", encoding="utf-8") as csv_f, \
+            open(json_file, "w", encoding="utf-8") as json_f:
+        writer = csv.DictWriter(csv_f, fieldnames=BUSINESS_FIELDS)
+        writer.writeheader()
+        
+        # Same layout as json.dump(businesses, indent=2) without the full list
+        json_f.write("[")
+        for business in businesses:
+            writer.writerow(business)
+            json_f.write(",\n  " if summary["total"] else "\n  ")
+            json_f.write(json.dumps(business, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+            
+            summary["total"] += 1
+            summary["with_phone"] += business["phone"] != "N/A"
+            summary["with_website"] += business["website"] != "N/A"
+            summary["with_email"] += business["emails"] != "N/A"
+            if len(summary["sample"]) < 5:
+                summary["sample"].append(business)
+        json_f.write("\n]" if summary["total"] else "]")
+    
+    return summary
+
 # ============================================
-# MAIN SCRAPER
+# PAGE EXTRACTION
 # ============================================
 
-def main():
-    # CLI Arguments
-    parser = argparse.ArgumentParser(description="Google Maps Business Scraper (Improved)")
-    parser.add_argument("--keyword", required=True, help="Business keyword")
-    parser.add_argument("--city", required=True, help="City / Area")
-    parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
-    parser.add_argument("--max-results", type=int, default=None, help="Maximum businesses to scrape")
-    parser.add_argument("--no-emails", action="store_true", help="Skip email extraction")
-    parser.add_argument("--timeout", type=int, default=300, help="Total timeout in seconds")
-    parser.add_argument("--resume", action="store_true", help="Resume from last checkpoint")
-    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+def extract_business_from_dom(page, index: int, limiter: RateLimiter,
+                              place_url: Optional[str] = None) -> Optional[Dict]:
+    """Click business card at index (or open place_url) and read its details panel"""
+    limiter.acquire(MAPS_TARGET)
     
-    args = parser.parse_args()
+    if place_url:
+        # Open the place directly (a recycled page has no results list)
+        def open_place():
+            response = page.goto(place_url, timeout=SEARCH_TIMEOUT)
+            if is_throttled(page.url, status=response.status if response else None):
+                raise ThrottledError(page.url)
+        
+        retry_action(open_place, limiter=limiter, target=MAPS_TARGET)
+    else:
+        # Re-query card to avoid stale element reference
+        card = page.query_selector_all(BUSINESS_CARD_SELECTOR)[index]
+        
+        # Click business card with retry
+        def click_card():
+            card.click()
+        
+        retry_action(click_card, limiter=limiter, target=MAPS_TARGET)
     
-    if args.verbose:
-        logger.setLevel(logging.DEBUG)
+    # Wait for details to load
+    if not wait_for_selector(page, BUSINESS_NAME_SELECTORS, BUSINESS_LOAD_TIMEOUT):
+        limiter.report(MAPS_TARGET, is_throttled(page.url))
+        logger.warning(f"Skipping business {index}: details didn't load")
+        return None
+    
+    limiter.report(MAPS_TARGET, throttled=False)
+    
+    time.sleep(1)
+    
+    # Extract data
+    business = {field: "N/A" for field in BUSINESS_FIELDS}
+    
+    # Business Name
+    name_el = get_selector(page, BUSINESS_NAME_SELECTORS)
+    if name_el:
+        try:
+            business["name"] = name_el.inner_text().strip()
+        except Exception as e:
+            logger.debug(f"Error extracting name: {e}")
+    
+    # Validate name (skip junk/placeholder data)
+    name = business["name"]
+    if not name or name.lower() in {"n/a", "results", "overview", "about", "reviews"}:
+        logger.warning(f"Skipping invalid name at index {index + 1}")
+        return None
+    
+    # Contact info from buttons
+    try:
+        buttons = page.query_selector_all("button")
+        for btn in buttons:
+            try:
+                aria = btn.get_attribute("aria-label")
+                if not aria:
+                    continue
+                
+                if "Address:" in aria:
+                    business["address"] = aria.replace("Address:", "").strip()
+                elif "Phone:" in aria:
+                    business["phone"] = aria.replace("Phone:", "").strip()
+                elif "Website:" in aria:
+                    business["website"] = aria.replace("Website:", "").strip()
+            except:
+                continue
+    except Exception as e:
+        logger.debug(f"Error extracting contact info: {e}")
     
-    KEYWORD = args.keyword
-    CITY = args.city
-    HEADLESS = args.headless
-    MAX_RESULTS = args.max_results
-    SKIP_EMAILS = args.no_emails
-    TIMEOUT = args.timeout
-    RESUME = args.resume
+    return business
+
+def extract_website_emails(page, website: str, limiter: RateLimiter, go_back: bool = True) -> Set[str]:
+    """Visit a business website and collect the emails on it"""
+    website_target = target_for_url(website)
+    emails = set()
+    try:
+        def extract_emails():
+            response = page.goto(website, timeout=WEBSITE_LOAD_TIMEOUT)
+            time.sleep(2)
+            content = page.content()
+            if is_throttled(page.url, content, response.status if response else None):
+                raise ThrottledError(page.url)
+            limiter.report(website_target, throttled=False)
+            found_emails = extract_emails_from_text(content)
+            return found_emails
+        
+        limiter.acquire(website_target)
+        emails = retry_action(extract_emails, limiter=limiter, target=website_target)
+        if go_back:
+            page.go_back()
+            time.sleep(1)
     
-    query = f"{KEYWORD} in {CITY}"
-    checkpoint_file = os.path.join(CHECKPOINT_DIR, f"{safe_filename(KEYWORD)}_{safe_filename(CITY)}.json")
+    except Exception as e:
+        logger.debug(f"Email extraction failed for {website}: {e}")
+        if go_back:
+            try:
+                page.go_back()
+            except:
+                pass
+    
+    return emails
+
+# ============================================
+# MAIN SCRAPER
+# ============================================
+
+def scrape(page, keyword: str, city: str, max_results: Optional[int] = None,
+           skip_emails: bool = False, timeout: int = 300, resume: bool = False,
+           limiter: Optional[RateLimiter] = None, on_progress=None,
+           extraction: str = "network", max_rss_mb: Optional[float] = None,
+           recycle_page=None) -> List[Dict]:
+    """Run one search on an open Maps page, export and return the businesses
+    
+    With max_rss_mb set, records are spilled to disk and the page is swapped
+    for a fresh one (via recycle_page) whenever RSS passes the ceiling. Runs
+    that spilled return an empty list; their results are in the exported files.
+    """
+    if limiter is None:
+        limiter = RateLimiter(
+            default_rate=WEBSITE_RATE,
+            rates={MAPS_TARGET: MAPS_RATE},
+            min_rate=MIN_RATE,
+            max_rate=MAX_RATE
+        )
+    
+    query = f"{keyword} in {city}"
+    checkpoint_file = os.path.join(CHECKPOINT_DIR, f"{safe_filename(keyword)}_{safe_filename(city)}.json")
+    places_file = os.path.join(CHECKPOINT_DIR, f"{safe_filename(keyword)}_{safe_filename(city)}.places.json")
+    spill_file = os.path.join(CHECKPOINT_DIR, f"{safe_filename(keyword)}_{safe_filename(city)}.spill.sqlite")
     
     logger.info(f"Starting scraper for: {query}")
-    logger.info(f"Config: headless={HEADLESS}, max_results={MAX_RESULTS}, skip_emails={SKIP_EMAILS}")
+    logger.info(f"Config: max_results={max_results}, skip_emails={skip_emails}, extraction={extraction}")
     
     start_time = time.time()
     businesses = []
     start_index = 0
+    resumed_places = []
     
     # Check for checkpoint
-    if RESUME:
+    if resume:
         checkpoint = load_checkpoint(checkpoint_file)
         if checkpoint:
             businesses = checkpoint["businesses"]
             start_index = checkpoint["index"]
+            resumed_places = load_places(places_file)
+    elif os.path.exists(places_file):
+        os.remove(places_file)
     
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=HEADLESS, slow_mo=50)
-            page = browser.new_page()
+    # Memory-bounded mode keeps results on disk once RSS passes the ceiling.
+    # A resumed run always picks up what an earlier run spilled, flag or not.
+    if not resume and os.path.exists(spill_file):
+        os.remove(spill_file)
+    store = None
+    if max_rss_mb or os.path.exists(spill_file):
+        store = SpillStore(spill_file, key=business_key)
+        ceiling = f"{max_rss_mb} MB RSS" if max_rss_mb else "off"
+        logger.info(f"Memory ceiling: {ceiling} ({len(store)} records already on disk)")
+    rss_ceiling = max_rss_mb
+    processed = 0
+    
+    # Navigate to Google Maps (pooled pages are usually already there)
+    if not page.url.startswith(MAPS_URL):
+        logger.info("Loading Google Maps...")
+        limiter.acquire(MAPS_TARGET)
+        response = page.goto(MAPS_URL, timeout=SEARCH_TIMEOUT)
+        limiter.report(MAPS_TARGET, is_throttled(page.url, status=response.status if response else None))
+    
+    # Search (Maps responses are captured while results load)
+    with ResponseCapture(page) as capture:
+        logger.info(f"Searching for: {query}")
+        search_box = get_selector(page, SEARCH_BOX_SELECTORS)
+        if not search_box:
+            raise RuntimeError("Could not find search box")
+        
+        search_box.fill(query)
+        time.sleep(1)
+        page.keyboard.press("Enter")
+        
+        # Wait for results panel with smart wait
+        logger.info("Waiting for results...")
+        if not wait_for_selector(page, RESULTS_PANEL_SELECTORS, SEARCH_TIMEOUT):
+            raise RuntimeError("Results panel did not load")
+        
+        results_panel = get_selector(page, RESULTS_PANEL_SELECTORS)
+        time.sleep(3)
+        
+        # Scroll to load all results
+        logger.info("Scrolling results panel...")
+        prev_height = 0
+        scroll_count = 0
+        
+        for scroll_attempt in range(50):
+            if time.time() - start_time > timeout:
+                logger.warning(f"Global timeout reached ({timeout}s)")
+                break
             
             try:
-                # Navigate to Google Maps
-                logger.info("Loading Google Maps...")
-                page.goto("https://www.google.com/maps", timeout=SEARCH_TIMEOUT)
+                page.evaluate(
+                    "(panel) => panel.scrollBy(0, panel.scrollHeight)",
+                    results_panel
+                )
+                time.sleep(DELAY_BETWEEN_SCROLL)
                 
-                # Search
-                logger.info(f"Searching for: {query}")
-                search_box = get_selector(page, SEARCH_BOX_SELECTORS)
-                if not search_box:
-                    raise RuntimeError("Could not find search box")
+                curr_height = page.evaluate(
+                    "(panel) => panel.scrollHeight",
+                    results_panel
+                )
                 
-                search_box.fill(query)
-                time.sleep(1)
-                page.keyboard.press("Enter")
+                if curr_height == prev_height:
+                    logger.info("✅ No more new results")
+                    break
                 
-                # Wait for results panel with smart wait
-                logger.info("Waiting for results...")
-                if not wait_for_selector(page, RESULTS_PANEL_SELECTORS, SEARCH_TIMEOUT):
-                    raise RuntimeError("Results panel did not load")
-                
-                results_panel = get_selector(page, RESULTS_PANEL_SELECTORS)
-                time.sleep(3)
-                
-                # Scroll to load all results
-                logger.info("Scrolling results panel...")
-                prev_height = 0
-                scroll_count = 0
-                
-                for scroll_attempt in range(50):
-                    if time.time() - start_time > TIMEOUT:
-                        logger.warning(f"Global timeout reached ({TIMEOUT}s)")
-                        break
+                prev_height = curr_height
+                scroll_count += 1
+            
+            except Exception as e:
+                logger.error(f"Scroll error: {e}")
+                break
+        
+        logger.info(f"✅ Scrolling complete ({scroll_count} scrolls)")
+    
+    # Collect places from network responses, falling back to business cards
+    places = capture.places(max_results) if extraction == "network" else []
+    if resumed_places:
+        # Response order varies between runs; the checkpoint index refers to this list
+        places = resumed_places
+        cards_count = len(places)
+        logger.info(f"📡 Resuming with {cards_count} places saved in the checkpoint")
+    elif places:
+        cards_count = len(places)
+        logger.info(f"📡 Captured {cards_count} places from {capture.responses} Maps responses")
+        save_places(places_file, places)
+    else:
+        if extraction == "network":
+            logger.warning("No place data in Maps responses, falling back to DOM extraction")
+        # Keep place URLs, not element references
+        all_cards = page.query_selector_all(BUSINESS_CARD_SELECTOR)
+        cards_count = len(all_cards)
+        logger.info(f"📍 Total businesses found: {cards_count}")
+        
+        if max_results:
+            cards_count = min(cards_count, max_results)
+        place_urls = [card.get_attribute("href") for card in all_cards[:cards_count]]
+        del all_cards
+    
+    # After a page recycle, DOM extraction resumes by place URL
+    resume_by_url = False
+    
+    # Process businesses (by index to avoid stale element references). Clicked
+    # cards load place-detail responses, which fill gaps in the details panel.
+    with capture:
+        for index in range(cards_count):
+            if time.time() - start_time > timeout:
+                logger.warning("Global timeout reached, saving progress...")
+                break
+            
+            if start_index > 0 and index < start_index:
+                continue
+            
+            # Check memory every few records, skipped cards included
+            if max_rss_mb and processed and processed % MEMORY_CHECK_INTERVAL == 0:
+                rss = process_tree_rss_mb()
+                if rss > rss_ceiling:
+                    logger.info(f"🧠 RSS {rss:.0f} MB over {rss_ceiling:.0f} MB, spilling {len(businesses)} records to disk")
+                    store.extend(businesses)
+                    businesses.clear()
+                    save_checkpoint(checkpoint_file, businesses, index)
+                    if recycle_page:
+                        page = recycle_page(page)
+                        capture.attach(page)
+                        resume_by_url = True
                     
-                    try:
-                        page.evaluate(
-                            "(panel) => panel.scrollBy(0, panel.scrollHeight)",
-                            results_panel
-                        )
-                        time.sleep(DELAY_BETWEEN_SCROLL)
-                        
-                        curr_height = page.evaluate(
-                            "(panel) => panel.scrollHeight",
-                            results_panel
-                        )
-                        
-                        if curr_height == prev_height:
-                            logger.info("✅ No more new results")
-                            break
-                        
-                        prev_height = curr_height
-                        scroll_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Scroll error: {e}")
-                        break
-                
-                logger.info(f"✅ Scrolling complete ({scroll_count} scrolls)")
+                    # Don't recycle every few records when the browser alone sits above the ceiling
+                    rss = process_tree_rss_mb()
+                    if rss > rss_ceiling:
+                        rss_ceiling = rss + RSS_HEADROOM_MB
+                        logger.warning(f"RSS still {rss:.0f} MB after spilling, raising ceiling to {rss_ceiling:.0f} MB")
+            processed += 1
+            
+            try:
+                if places:
+                    business = dict(places[index])
+                else:
+                    business = extract_business_from_dom(
+                        page, index, limiter, place_urls[index] if resume_by_url else None
+                    )
+                    if not business:
+                        continue
+                    capture.fill(business)
                 
-                # Collect business cards (get count, not references)
-                all_cards = page.query_selector_all(BUSINESS_CARD_SELECTOR)
-                cards_count = len(all_cards)
-                logger.info(f"📍 Total businesses found: {cards_count}")
+                # Email Extraction
+                website = business["website"]
+                emails = set()
+                if not skip_emails and website != "N/A" and not should_skip_email_extraction(website):
+                    # Clicking cards needs the results list back afterwards
+                    emails = extract_website_emails(page, website, limiter, go_back=not (places or resume_by_url))
+                business["emails"] = ", ".join(sorted(emails)) if emails else "N/A"
                 
-                if MAX_RESULTS:
-                    cards_count = min(cards_count, MAX_RESULTS)
+                businesses.append(business)
+                logger.info(f"✅ {index + 1}. {business['name']}")
+                if on_progress:
+                    on_progress(index + 1, cards_count, business["name"])
                 
-                # Process businesses (by index to avoid stale element references)
-                for index in range(cards_count):
-                    if time.time() - start_time > TIMEOUT:
-                        logger.warning("Global timeout reached, saving progress...")
-                        break
-                    
-                    if start_index > 0 and index < start_index:
-                        continue
-                    
-                    try:
-                        time.sleep(DELAY_BETWEEN_BUSINESS)
-                        
-                        # Re-query card to avoid stale element reference
-                        card = page.query_selector_all(BUSINESS_CARD_SELECTOR)[index]
-                        
-                        # Click business card with retry
-                        def click_card():
-                            card.click()
-                        
-                        retry_action(click_card)
-                        
-                        # Wait for details to load
-                        if not wait_for_selector(page, BUSINESS_NAME_SELECTORS, BUSINESS_LOAD_TIMEOUT):
-                            logger.warning(f"Skipping business {index}: details didn't load")
-                            continue
-                        
-                        time.sleep(1)
-                        
-                        # Extract data
-                        name = "N/A"
-                        address = "N/A"
-                        phone = "N/A"
-                        website = "N/A"
-                        emails = set()
-                        
-                        # Business Name
-                        name_el = get_selector(page, BUSINESS_NAME_SELECTORS)
-                        if name_el:
-                            try:
-                                name = name_el.inner_text().strip()
-                            except Exception as e:
-                                logger.debug(f"Error extracting name: {e}")
-                        
-                        # Validate name (skip junk/placeholder data)
-                        if not name or name.lower() in {"results", "overview", "about", "reviews"}:
-                            logger.warning(f"Skipping invalid name at index {index + 1}")
-                            continue
-                        
-                        # Contact info from buttons
-                        try:
-                            buttons = page.query_selector_all("button")
-                            for btn in buttons:
-                                try:
-                                    aria = btn.get_attribute("aria-label")
-                                    if not aria:
-                                        continue
-                                    
-                                    if "Address:" in aria:
-                                        address = aria.replace("Address:", "").strip()
-                                    elif "Phone:" in aria:
-                                        phone = aria.replace("Phone:", "").strip()
-                                    elif "Website:" in aria:
-                                        website = aria.replace("Website:", "").strip()
-                                except:
-                                    continue
-                        except Exception as e:
-                            logger.debug(f"Error extracting contact info: {e}")
-                        
-                        # Email Extraction
-                        if not SKIP_EMAILS and website != "N/A" and not should_skip_email_extraction(website):
-                            try:
-                                def extract_emails():
-                                    page.goto(website, timeout=WEBSITE_LOAD_TIMEOUT)
-                                    time.sleep(2)
-                                    content = page.content()
-                                    found_emails = extract_emails_from_text(content)
-                                    return found_emails
-                                
-                                emails = retry_action(extract_emails)
-                                time.sleep(DELAY_AFTER_EMAIL_EXTRACTION)
-                                page.go_back()
-                                time.sleep(1)
-                            
-                            except Exception as e:
-                                logger.debug(f"Email extraction failed for {name}: {e}")
-                                try:
-                                    page.go_back()
-                                except:
-                                    pass
-                        
-                        business = {
-                            "name": name,
-                            "address": address,
-                            "phone": phone,
-                            "website": website,
-                            "emails": ", ".join(sorted(emails)) if emails else "N/A"
-                        }
-                        
-                        businesses.append(business)
-                        logger.info(f"✅ {index + 1}. {name}")
-                        
-                        # Save checkpoint every 10 businesses
-                        if (index + 1) % 10 == 0:
-                            save_checkpoint(checkpoint_file, businesses, index + 1)
-                    
-                    except Exception as e:
-                        logger.error(f"❌ Failed at business {index}: {e}")
-                        continue
-                
-                logger.info(f"Processing complete. Total collected: {len(businesses)}")
+                # Save checkpoint every 10 businesses
+                if (index + 1) % 10 == 0:
+                    save_checkpoint(checkpoint_file, businesses, index + 1)
             
-            finally:
-                browser.close()
-        
-        # Deduplication
-        logger.info("Deduplicating businesses...")
+            except Exception as e:
+                logger.error(f"❌ Failed at business {index}: {e}")
+                continue
+    
+    spilled = len(store) if store is not None else 0
+    logger.info(f"Processing complete. Total collected: {len(businesses) + spilled}")
+    
+    # Deduplication (streamed from disk when records were spilled)
+    logger.info("Deduplicating businesses...")
+    if spilled:
+        store.extend(businesses)
+        businesses = []
+        deduplicated = iter_deduplicated(store)
+    else:
         businesses = deduplicate_businesses(businesses)
-        logger.info(f"🧹 After deduplication: {len(businesses)} businesses")
-        
-        # Display sample
-        logger.info("\n📌 SAMPLE OUTPUT (first 5):")
-        for b in businesses[:5]:
-            logger.info(str(b))
-        
-        # Save CSV
-        csv_file = os.path.join(OUTPUT_DIR, "businesses.csv")
-        with open(csv_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=["name", "address", "phone", "website", "emails"]
+        deduplicated = businesses
+    
+    # Save CSV + JSON
+    csv_file = os.path.join(OUTPUT_DIR, "businesses.csv")
+    json_file = os.path.join(OUTPUT_DIR, "businesses.json")
+    summary = export_businesses(deduplicated, csv_file, json_file)
+    total = summary["total"]
+    logger.info(f"🧹 After deduplication: {total} businesses")
+    
+    # Display sample
+    logger.info("\n📌 SAMPLE OUTPUT (first 5):")
+    for b in summary["sample"]:
+        logger.info(str(b))
+    
+    logger.info(f"📁 CSV saved → {csv_file}")
+    logger.info(f"📁 JSON saved → {json_file}")
+    
+    # Statistics summary
+    with_phone = summary["with_phone"]
+    with_website = summary["with_website"]
+    with_email = summary["with_email"]
+    
+    logger.info("\n" + "="*50)
+    logger.info("📊 FINAL SUMMARY")
+    logger.info("="*50)
+    logger.info(f"Total businesses: {total}")
+    logger.info(f"With phone number: {with_phone} ({100*with_phone//total if total else 0}%)")
+    logger.info(f"With website: {with_website} ({100*with_website//total if total else 0}%)")
+    logger.info(f"With email: {with_email} ({100*with_email//total if total else 0}%)")
+    logger.info("="*50)
+    
+    # Rate limiter summary
+    for target, stats in limiter.stats().items():
+        logger.info(
+            f"🚦 {target}: {stats['achieved_rate']} req/s achieved "
+            f"(limit {stats['rate_limit']} req/s, {stats['requests']} requests, "
+            f"{stats['throttled']} throttled, {stats['waited_seconds']}s waited)"
+        )
+    
+    # Cleanup checkpoint on success
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+        logger.info("Checkpoint cleaned up")
+    if os.path.exists(places_file):
+        os.remove(places_file)
+    if store is not None:
+        store.remove()
+    
+    elapsed = time.time() - start_time
+    logger.info(f"⏱️  Total time: {elapsed:.1f}s")
+    logger.info(f"⚡ Throughput: {60 * total / elapsed if elapsed else 0:.1f} businesses/minute")
+    logger.info(f"📊 Log file: {log_file}")
+    
+    return businesses
+
+def main():
+    # Imported here so the data helpers above work without Playwright installed
+    from playwright.sync_api import sync_playwright
+    
+    # CLI Arguments
+    parser = argparse.ArgumentParser(description="Google Maps Business Scraper (Improved)")
+    parser.add_argument("--keyword", required=True, help="Business keyword")
+    parser.add_argument("--city", required=True, help="City / Area")
+    parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
+    parser.add_argument("--max-results", type=int, default=None, help="Maximum businesses to scrape")
+    parser.add_argument("--no-emails", action="store_true", help="Skip email extraction")
+    parser.add_argument("--timeout", type=int, default=300, help="Total timeout in seconds")
+    parser.add_argument("--resume", action="store_true", help="Resume from last checkpoint")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    parser.add_argument("--maps-rate", type=float, default=MAPS_RATE, help="Initial Google Maps requests per second")
+    parser.add_argument("--extraction", choices=["network", "dom"], default="network",
+                        help="Read place data from Maps network responses, or click each card (DOM)")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="Memory ceiling: spill results to disk and recycle the page above this RSS")
+    parser.add_argument("--rate-state", default=None, help="Rate limiter state file shared between worker processes")
+    
+    args = parser.parse_args()
+    
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    
+    limiter = RateLimiter(
+        default_rate=WEBSITE_RATE,
+        rates={MAPS_TARGET: args.maps_rate},
+        min_rate=MIN_RATE,
+        max_rate=MAX_RATE,
+        state_file=args.rate_state
+    )
+    
+    logger.info(f"Config: headless={args.headless}")
+    
+    try:
+        with sync_playwright() as p:
+            pool = SessionPool(
+                p.chromium,
+                headless=args.headless,
+                storage_state_file=STORAGE_STATE_FILE,
+                timeout=SEARCH_TIMEOUT,
+                limiter=limiter
+            )
+            try:
+                with pool.session() as page:
+                    scrape(
+                        page,
+                        args.keyword,
+                        args.city,
+                        max_results=args.max_results,
+                        skip_emails=args.no_emails,
+                        timeout=args.timeout,
+                        resume=args.resume,
+                        limiter=limiter,
+                        extraction=args.extraction,
+                        max_rss_mb=args.max_rss_mb,
+                        recycle_page=pool.recycle
+                    )
+            finally:
+                pool.close()
+            
+            session_stats = pool.stats()
+            logger.info(
+                f"🌐 Browser session: {session_stats['last_startup_seconds']}s startup, "
+                f"{session_stats['steady_rss_mb']} MB RSS (peak {session_stats['peak_rss_mb']} MB)"
             )
-            writer.writeheader()
-            writer.writerows(businesses)
-        
-        logger.info(f"📁 CSV saved → {csv_file}")
-        
-        # Save JSON
-        json_file = os.path.join(OUTPUT_DIR, "businesses.json")
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(businesses, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"📁 JSON saved → {json_file}")
-        
-        # Statistics summary
-        with_phone = sum(1 for b in businesses if b["phone"] != "N/A")
-        with_website = sum(1 for b in businesses if b["website"] != "N/A")
-        with_email = sum(1 for b in businesses if b["emails"] != "N/A")
-        
-        logger.info("\n" + "="*50)
-        logger.info("📊 FINAL SUMMARY")
-        logger.info("="*50)
-        logger.info(f"Total businesses: {len(businesses)}")
-        logger.info(f"With phone number: {with_phone} ({100*with_phone//len(businesses) if businesses else 0}%)")
-        logger.info(f"With website: {with_website} ({100*with_website//len(businesses) if businesses else 0}%)")
-        logger.info(f"With email: {with_email} ({100*with_email//len(businesses) if businesses else 0}%)")
-        logger.info("="*50)
-    
-        # Cleanup checkpoint on success
-        if os.path.exists(checkpoint_file):
-            os.remove(checkpoint_file)
-            logger.info("Checkpoint cleaned up")
-        
-        elapsed = time.time() - start_time
-        logger.info(f"⏱️  Total time: {elapsed:.1f}s")
-        logger.info(f"📊 Log file: {log_file}")
     
     except Exception as e:
         logger.exception(f"Fatal error: {e}")
@@ -0,0 +1,247 @@
+"""
+Adaptive token-bucket rate limiting for all scraping components.
+
+One bucket per target: "maps" for Google Maps, or the domain of a business
+website. Each bucket backs off (halves its rate) on throttle signals such as
+CAPTCHA pages, consent walls or HTTP 429, and slowly ramps back up while
+responses stay healthy.
+
+The limiter is thread-safe, offers an async acquire for asyncio tasks and can
+share its budget (rate and tokens, not stats) between worker processes through
+a locked JSON state file. Shared budgets expire after STATE_TTL seconds idle,
+so an old backoff doesn't outlive the traffic that caused it.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process sharing
+    fcntl = None
+
+MAPS_TARGET = "maps"
+
+# Throttle signals
+THROTTLE_STATUS_CODES = {429}
+THROTTLE_URL_MARKERS = ("google.com/sorry/", "consent.google.com")
+THROTTLE_TEXT_MARKERS = (
+    "our systems have detected unusual traffic",
+    "unusual traffic from your computer network",
+)
+
+# Adaptation
+BACKOFF_FACTOR = 0.5  # rate multiplier on a throttle signal
+RAMP_UP_FACTOR = 1.1  # rate multiplier after a healthy streak
+HEALTHY_STREAK = 5  # healthy responses needed before ramping up
+STATE_TTL = 600  # seconds before a shared budget is ignored
+
+# google.com, www.google.co.uk, maps.google.com.au, ...
+GOOGLE_HOST = re.compile(r"^(?:[a-z0-9-]+\.)*google\.(?:com|[a-z]{2}|com?\.[a-z]{2})$")
+
+
+def target_for_url(url: str) -> str:
+    """Map a URL to its bucket name (Maps or the website domain)"""
+    # Websites from Maps labels usually come without a scheme ("joespizza.com")
+    if "://" not in url and not url.startswith("/"):
+        url = "//" + url
+    domain = (urlparse(url).hostname or "").lower()
+    if domain.startswith("www."):
+        domain = domain[4:]
+    if not domain or GOOGLE_HOST.match(domain):
+        return MAPS_TARGET
+    return domain
+
+
+class ThrottledError(Exception):
+    """Raised by an action whose response was a throttle signal"""
+
+
+def is_throttled(url: str = "", content: str = "", status: Optional[int] = None) -> bool:
+    """Detect CAPTCHA, consent and 429 responses"""
+    if status in THROTTLE_STATUS_CODES:
+        return True
+    if any(marker in url for marker in THROTTLE_URL_MARKERS):
+        return True
+    if content:
+        lowered = content.lower()
+        return any(marker in lowered for marker in THROTTLE_TEXT_MARKERS)
+    return False
+
+
+class TokenBucket:
+    """Token bucket with AIMD rate adaptation and achieved-rate stats"""
+
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 min_rate: float = 0.05, max_rate: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.tokens = capacity
+        self.updated = time.time()
+        self.healthy_streak = 0
+        self.throttled = 0
+        self.acquired = 0
+        self.waited = 0.0
+        self.first = None
+        self.last = None
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take a token and return how long the caller must wait for it"""
+        self._refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        self.acquired += 1
+        self.waited += wait
+        if self.first is None:
+            self.first = now + wait
+        self.last = now + wait
+        return wait
+
+    def backoff(self):
+        """Slow down after a throttle signal"""
+        self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+        self.tokens = min(self.tokens, 0.0)
+        self.healthy_streak = 0
+        self.throttled += 1
+
+    def recover(self):
+        """Speed up again after a streak of healthy responses"""
+        self.healthy_streak += 1
+        if self.healthy_streak >= HEALTHY_STREAK:
+            self.rate = min(self.max_rate, self.rate * RAMP_UP_FACTOR)
+            self.healthy_streak = 0
+
+    def achieved_rate(self) -> float:
+        """Requests per second actually granted"""
+        if self.acquired < 2 or self.last <= self.first:
+            return 0.0
+        return (self.acquired - 1) / (self.last - self.first)
+
+    def budget(self) -> Dict:
+        """The part of the bucket shared with other processes"""
+        return {"rate": self.rate, "tokens": self.tokens, "updated": self.updated}
+
+
+class RateLimiter:
+    """Per-target token buckets shared across threads, tasks and processes"""
+
+    def __init__(self, default_rate: float = 1.0, rates: Optional[Dict[str, float]] = None,
+                 min_rate: float = 0.05, max_rate: Optional[float] = None,
+                 state_file: Optional[str] = None):
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.state_file = state_file if fcntl else None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, target: str) -> TokenBucket:
+        if target not in self._buckets:
+            self._buckets[target] = TokenBucket(
+                self.rates.get(target, self.default_rate),
+                min_rate=self.min_rate,
+                max_rate=self.max_rate
+            )
+        return self._buckets[target]
+
+    def _load_budget(self, target: str, shared: Optional[Dict]):
+        """Adopt a fresh shared budget for target; stats stay per limiter"""
+        seeded = target not in self._buckets
+        bucket = self._bucket(target)
+        if not shared:
+            return
+        bucket.tokens = shared["tokens"]
+        bucket.updated = shared["updated"]
+        # A new bucket starts from the configured rate unless a recent
+        # backoff elsewhere is still in force
+        bucket.rate = min(bucket.rate, shared["rate"]) if seeded else shared["rate"]
+
+    @contextmanager
+    def _locked(self, target: Optional[str] = None):
+        """Hold the thread lock and, if configured, sync target's budget via the state file"""
+        with self._lock:
+            if not self.state_file or target is None:
+                yield
+                return
+
+            os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+            with open(self.state_file, "a+", encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read() or "{}")
+                    except ValueError:
+                        state = {}
+                    now = time.time()
+                    state = {
+                        name: shared for name, shared in state.items()
+                        if isinstance(shared, dict) and now - shared.get("updated", 0) <= STATE_TTL
+                    }
+                    self._load_budget(target, state.get(target))
+                    yield
+                    state[target] = self._buckets[target].budget()
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def reserve(self, target: str = MAPS_TARGET) -> float:
+        """Reserve a slot and return the delay before it may be used"""
+        with self._locked(target):
+            return self._bucket(target).reserve(time.time())
+
+    def acquire(self, target: str = MAPS_TARGET) -> float:
+        """Block until a request to target is allowed; return seconds waited"""
+        wait = self.reserve(target)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, target: str = MAPS_TARGET) -> float:
+        """Async variant of acquire for asyncio tasks"""
+        wait = self.reserve(target)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def report(self, target: str, throttled: bool):
+        """Feed a response outcome back into the target's bucket"""
+        with self._locked(target):
+            bucket = self._bucket(target)
+            if throttled:
+                bucket.backoff()
+            else:
+                bucket.recover()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Current limit and this limiter's achieved rate per target"""
+        with self._locked():
+            return {
+                target: {
+                    "rate_limit": round(bucket.rate, 3),
+                    "achieved_rate": round(bucket.achieved_rate(), 3),
+                    "requests": bucket.acquired,
+                    "throttled": bucket.throttled,
+                    "waited_seconds": round(bucket.waited, 1),
+                }
+                for target, bucket in self._buckets.items()
+            }
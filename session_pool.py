@@ -0,0 +1,246 @@
+"""
+Warm pool of browser contexts with persisted storage state.
+
+Launching Chromium and loading Google Maps (plus any consent interstitial)
+costs several seconds per query. The pool keeps contexts open and already on
+Maps, persists cookies/consent to a storage state file so new contexts start
+past the consent wall, health-checks contexts and takes used pages back to
+Maps before handing them out, and recycles them after N queries or when
+memory passes a threshold.
+
+Playwright's sync API is not thread-safe: a pool must only be used from the
+thread that created it.
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from rate_limiter import RateLimiter, MAPS_TARGET, is_throttled
+
+logger = logging.getLogger(__name__)
+
+MAPS_URL = "https://www.google.com/maps"
+CONSENT_URL_MARKER = "consent.google.com"
+CONSENT_BUTTON_SELECTORS = [
+    'button[aria-label="Accept all"]',
+    'button:has-text("Accept all")',
+    'form[action*="consent"] button',
+]
+
+
+def process_tree_rss_mb(pid: Optional[int] = None) -> float:
+    """RSS of a process and all its descendants in MB (Linux only, else 0)"""
+    pid = pid or os.getpid()
+    if not os.path.isdir("/proc"):
+        return 0.0
+
+    children: Dict[int, List[int]] = {}
+    rss_pages: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm may contain spaces, fields after it are fixed
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+            rss_pages[int(entry)] = int(fields[21])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += rss_pages.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class _Session:
+    """One browser context with its page and usage counters"""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.queries = 0
+
+
+class SessionPool:
+    """Hands out warm Maps pages and recycles their contexts"""
+
+    def __init__(self, browser_type, headless: bool = True, size: int = 1,
+                 max_queries: int = 20, max_rss_mb: Optional[float] = 1500,
+                 storage_state_file: Optional[str] = None, timeout: int = 60000,
+                 limiter: Optional[RateLimiter] = None):
+        self.browser_type = browser_type
+        self.headless = headless
+        self.size = size
+        self.max_queries = max_queries
+        self.max_rss_mb = max_rss_mb
+        self.storage_state_file = storage_state_file
+        self.timeout = timeout
+        self.limiter = limiter
+        self.browser = None
+        self._idle: List[_Session] = []
+        self._busy: List[_Session] = []
+
+        # Metrics
+        self.startup_latencies: List[float] = []
+        self.rss_samples: List[float] = []
+        self.created = 0
+        self.recycled = 0
+
+    def start(self):
+        """Launch the browser and fill the pool with warm sessions"""
+        if self.browser is None:
+            self.browser = self.browser_type.launch(headless=self.headless, slow_mo=50)
+        while len(self._idle) < self.size:
+            self._idle.append(self._new_session())
+        return self
+
+    def _new_session(self) -> _Session:
+        state = self.storage_state_file
+        context = self.browser.new_context(
+            storage_state=state if state and os.path.exists(state) else None
+        )
+        session = _Session(context, context.new_page())
+        self._open_maps(session)
+        self.created += 1
+        return session
+
+    def _open_maps(self, session: _Session):
+        page = session.page
+        if self.limiter:
+            self.limiter.acquire(MAPS_TARGET)
+        response = page.goto(MAPS_URL, timeout=self.timeout)
+        if self._accept_consent(page):
+            # Later contexts start from this state, past the consent wall
+            self._save_state(session)
+        if self.limiter:
+            self.limiter.report(MAPS_TARGET, is_throttled(page.url, status=response.status if response else None))
+
+    def _accept_consent(self, page) -> bool:
+        """Click through Google's consent interstitial if the page landed on it"""
+        if CONSENT_URL_MARKER not in page.url:
+            return False
+        for selector in CONSENT_BUTTON_SELECTORS:
+            try:
+                button = page.query_selector(selector)
+                if not button:
+                    continue
+                button.click()
+                page.wait_for_url(f"{MAPS_URL}**", timeout=self.timeout)
+                logger.info("Accepted Google consent page")
+                return True
+            except Exception as e:
+                logger.debug(f"Consent button {selector} failed: {e}")
+        logger.warning("Could not get past the Google consent page")
+        return False
+
+    def _reset(self, session: _Session) -> bool:
+        """Take a used page back to a clean Maps view (old results would satisfy the next search's waits)"""
+        if session.queries == 0:
+            return True
+        try:
+            self._open_maps(session)
+            return True
+        except Exception as e:
+            logger.debug(f"Could not reset page: {e}")
+            return False
+
+    def _is_healthy(self, session: _Session) -> bool:
+        try:
+            return not session.page.is_closed() and session.page.evaluate("() => document.readyState") is not None
+        except Exception:
+            return False
+
+    def _save_state(self, session: _Session):
+        if not self.storage_state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.storage_state_file) or ".", exist_ok=True)
+            session.context.storage_state(path=self.storage_state_file)
+        except Exception as e:
+            logger.debug(f"Could not save storage state: {e}")
+
+    def _retire(self, session: _Session):
+        self._save_state(session)
+        try:
+            session.context.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def session(self):
+        """Borrow a warm page for one query"""
+        started = time.time()
+        if self.browser is None:
+            self.start()
+
+        session = None
+        while self._idle and session is None:
+            candidate = self._idle.pop()
+            if self._is_healthy(candidate) and self._reset(candidate):
+                session = candidate
+            else:
+                logger.info("Discarding unhealthy browser context")
+                self._retire(candidate)
+                self.recycled += 1
+        if session is None:
+            session = self._new_session()
+
+        self.startup_latencies.append(time.time() - started)
+        self._busy.append(session)
+        try:
+            yield session.page
+        finally:
+            self._busy.remove(session)
+            session.queries += 1
+            rss = process_tree_rss_mb()
+            self.rss_samples.append(rss)
+
+            if session.queries >= self.max_queries or (self.max_rss_mb and rss > self.max_rss_mb):
+                logger.info(f"Recycling browser context after {session.queries} queries ({rss:.0f} MB RSS)")
+                self._retire(session)
+                self.recycled += 1
+            else:
+                self._save_state(session)
+                self._idle.append(session)
+
+    def recycle(self, page):
+        """Swap a borrowed page for a fresh warm one mid-query, freeing its memory"""
+        session = next(s for s in self._busy if s.page is page)
+        fresh = self._new_session()
+        self._retire(session)
+        self.recycled += 1
+        session.context, session.page, session.queries = fresh.context, fresh.page, 0
+        logger.info(f"Recycled browser context ({process_tree_rss_mb():.0f} MB RSS after)")
+        return session.page
+
+    def close(self):
+        """Persist state and shut the browser down"""
+        while self._idle:
+            self._retire(self._idle.pop())
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+
+    def stats(self) -> Dict:
+        """Startup latency and memory figures for reporting"""
+        latencies = self.startup_latencies
+        return {
+            "queries": len(latencies),
+            "contexts_created": self.created,
+            "contexts_recycled": self.recycled,
+            "last_startup_seconds": round(latencies[-1], 2) if latencies else None,
+            "avg_startup_seconds": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "steady_rss_mb": round(self.rss_samples[-1], 1) if self.rss_samples else None,
+            "peak_rss_mb": round(max(self.rss_samples), 1) if self.rss_samples else None,
+        }
@@ -0,0 +1,67 @@
+"""
+On-disk store for scraped businesses on memory-bounded runs.
+
+Records are appended to a SQLite file instead of growing a list in RAM.
+groups() streams them back grouped by dedup key (in first-seen order) so
+deduplication and export never need the whole result set in memory.
+"""
+
+import json
+import os
+import sqlite3
+from itertools import groupby
+from typing import Callable, Dict, Iterable, Iterator, List
+
+
+class SpillStore:
+    """Append-only SQLite store of business dicts"""
+
+    def __init__(self, path: str, key: Callable[[Dict], tuple]):
+        self.path = path
+        self.key = key
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, group_key TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS records_group ON records (group_key, seq)")
+        self.conn.commit()
+
+    def extend(self, businesses: Iterable[Dict]):
+        """Append businesses to disk"""
+        self.conn.executemany(
+            "INSERT INTO records (group_key, data) VALUES (?, ?)",
+            (
+                (json.dumps(self.key(b), ensure_ascii=False), json.dumps(b, ensure_ascii=False))
+                for b in businesses
+            )
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for (data,) in self.conn.execute("SELECT data FROM records ORDER BY seq"):
+            yield json.loads(data)
+
+    def groups(self) -> Iterator[List[Dict]]:
+        """Records sharing a dedup key, groups ordered by first appearance"""
+        rows = self.conn.execute(
+            "SELECT r.group_key, r.data FROM records r "
+            "JOIN (SELECT group_key, MIN(seq) AS first FROM records GROUP BY group_key) g "
+            "ON r.group_key = g.group_key "
+            "ORDER BY g.first, r.seq"
+        )
+        for _, group in groupby(rows, key=lambda row: row[0]):
+            yield [json.loads(data) for _, data in group]
+
+    def close(self):
+        self.conn.close()
+
+    def remove(self):
+        """Close and delete the store file"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
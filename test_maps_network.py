@@ -0,0 +1,113 @@
+"""
+Tests for parsing place data out of recorded Maps responses
+"""
+
+import os
+
+from maps_network import ResponseCapture, parse_places
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parse_search_response():
+    places = parse_places(load_fixture("maps_search_response.txt"))
+    assert [p["name"] for p in places] == ["Joe's Pizza", "Prince Street Pizza", "Lucali"]
+
+    joes = places[0]
+    assert joes["address"] == "7 Carmine St, New York, NY 10014"
+    assert joes["phone"] == "(212) 366-1182"
+    assert joes["website"] == "https://www.joespizzanyc.com/"
+    assert joes["latitude"] == 40.7305991
+    assert joes["longitude"] == -73.9893831
+    assert joes["rating"] == 4.5
+    assert joes["reviews"] == 15234
+    assert joes["category"] == "Pizza restaurant"
+    assert joes["place_id"] == "ChIJ8Q2WSpJZwokRQz-bYYgEskM"
+    assert joes["emails"] == "N/A"
+
+
+def test_parse_search_response_fallbacks():
+    places = parse_places(load_fixture("maps_search_response.txt"))
+    # Google redirect wrapper is removed
+    assert places[1]["website"] == "https://princestreetpizza.com/"
+    # Address lines are joined when the full address is missing
+    assert places[2]["address"] == "575 Henry St, Brooklyn, NY 11231"
+    assert places[2]["phone"] == "N/A"
+    assert places[2]["website"] == "N/A"
+
+
+def test_parse_invalid_payload():
+    assert parse_places("<html>not json</html>") == []
+    assert parse_places(")]}'\n[]") == []
+
+
+def test_capture_merges_detail_responses():
+    capture = ResponseCapture()
+    capture.add_payload(load_fixture("maps_search_response.txt"))
+    capture.add_payload(load_fixture("maps_place_response.txt"))
+
+    places = capture.places()
+    assert len(places) == 3
+    assert places[2]["phone"] == "(718) 858-4086"
+    assert places[2]["website"] == "http://www.lucali.com/"
+    assert capture.places(limit=2) == places[:2]
+    assert capture.responses == 2
+
+
+def test_saved_places_keep_captured_order(tmp_path):
+    from maps_scraper import save_checkpoint, load_checkpoint, save_places, load_places
+
+    places = parse_places(load_fixture("maps_search_response.txt"))
+    places_file = str(tmp_path / "checkpoint.places.json")
+    checkpoint_file = str(tmp_path / "checkpoint.json")
+    save_places(places_file, places)
+    save_checkpoint(checkpoint_file, places[:1], 1)
+
+    # The periodic checkpoint stays small; the place list is stored once
+    checkpoint = load_checkpoint(checkpoint_file)
+    assert checkpoint["index"] == 1
+    assert "places" not in checkpoint
+    assert [p["place_id"] for p in load_places(places_file)] == [p["place_id"] for p in places]
+    assert load_places(str(tmp_path / "missing.json")) == []
+
+
+def test_capture_fills_dom_record():
+    capture = ResponseCapture()
+    capture.add_payload(load_fixture("maps_search_response.txt"))
+    capture.add_payload(load_fixture("maps_place_response.txt"))
+
+    business = {"name": "Lucali", "address": "575 Henry St, Brooklyn, NY 11231",
+                "phone": "N/A", "website": "N/A", "emails": "N/A"}
+    capture.fill(business)
+    assert business["phone"] == "(718) 858-4086"
+    assert business["website"] == "http://www.lucali.com/"
+    assert business["place_id"] != "N/A"
+    assert business["address"] == "575 Henry St, Brooklyn, NY 11231"
+
+    unknown = {"name": "Not Listed", "phone": "N/A"}
+    assert capture.fill(unknown) == {"name": "Not Listed", "phone": "N/A"}
+
+
+class FakePage:
+    def __init__(self):
+        self.listeners = []
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+
+def test_capture_follows_recycled_page():
+    old, new = FakePage(), FakePage()
+    with ResponseCapture(old) as capture:
+        assert len(old.listeners) == 1
+        capture.attach(new)
+        assert old.listeners == [] and len(new.listeners) == 1
+    assert new.listeners == []
@@ -0,0 +1,169 @@
+"""
+Tests for memory-bounded runs: streamed dedup/export and the spill path of scrape()
+"""
+
+import json
+import logging
+import os
+
+import pytest
+
+import maps_scraper
+from maps_scraper import export_businesses, iter_deduplicated, business_key, save_checkpoint, save_places
+from maps_network import parse_places
+from session_pool import MAPS_URL
+from spill_store import SpillStore
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+with open(os.path.join(FIXTURES, "maps_search_response.txt"), encoding="utf-8") as f:
+    SEARCH_RESPONSE = f.read()
+
+
+def business(name, phone="(212) 555-0100", emails="N/A", **fields):
+    record = {field: "N/A" for field in maps_scraper.BUSINESS_FIELDS}
+    record.update(name=name, phone=phone, emails=emails, **fields)
+    return record
+
+
+def test_iter_deduplicated_merges_across_batches(tmp_path):
+    store = SpillStore(str(tmp_path / "run.spill.sqlite"), key=business_key)
+    store.extend([business("Joe's Pizza", emails="joe@pizza.com"), business("Lucali", phone="N/A")])
+    store.extend([business("joe's pizza ", phone="212-555-0100", emails="info@pizza.com")])
+    store.extend([business("Joe's Pizza", emails="N/A")])
+
+    deduplicated = list(iter_deduplicated(store))
+    assert [b["name"] for b in deduplicated] == ["Joe's Pizza", "Lucali"]
+    assert deduplicated[0]["emails"] == "info@pizza.com, joe@pizza.com"
+    assert deduplicated[1]["emails"] == "N/A"
+
+
+@pytest.mark.parametrize("businesses", [
+    [],
+    [business("Café ☕", emails="a@cafe.com", rating=4.5, reviews=12)],
+    [business(f"Shop {i}", latitude=40.7 + i / 100) for i in range(3)],
+])
+def test_export_matches_json_dump(tmp_path, businesses):
+    csv_file = str(tmp_path / "businesses.csv")
+    json_file = str(tmp_path / "businesses.json")
+    summary = export_businesses(iter(businesses), csv_file, json_file)
+
+    with open(json_file, encoding="utf-8") as f:
+        exported = f.read()
+    assert exported == json.dumps(businesses, indent=2, ensure_ascii=False)
+    assert summary["total"] == len(businesses)
+    assert summary["with_email"] == sum(b["emails"] != "N/A" for b in businesses)
+    with open(csv_file, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == len(businesses) + 1
+
+
+class FakeResponse:
+    def __init__(self, url, text):
+        self.url = url
+        self._text = text
+
+    def text(self):
+        return self._text
+
+
+class FakeElement:
+    def fill(self, text):
+        pass
+
+
+class FakeKeyboard:
+    def __init__(self, page):
+        self.page = page
+
+    def press(self, key):
+        # Submitting the search downloads the results payload
+        for handler in list(self.page.listeners):
+            handler(FakeResponse("https://www.google.com/search?tbm=map&q=pizza", SEARCH_RESPONSE))
+
+
+class FakePage:
+    def __init__(self):
+        self.url = MAPS_URL
+        self.listeners = []
+        self.keyboard = FakeKeyboard(self)
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+    def query_selector(self, selector):
+        return FakeElement()
+
+    def wait_for_selector(self, selector, timeout=None):
+        pass
+
+    def evaluate(self, script, arg=None):
+        return 1000
+
+
+@pytest.fixture
+def run_dirs(tmp_path, monkeypatch):
+    """Checkpoints and output in tmp_path, no sleeping, RSS check on every record"""
+    monkeypatch.setattr(maps_scraper, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(maps_scraper, "OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.setattr(maps_scraper, "MEMORY_CHECK_INTERVAL", 1)
+    monkeypatch.setattr(maps_scraper.time, "sleep", lambda seconds: None)
+    os.makedirs(tmp_path / "checkpoints")
+    os.makedirs(tmp_path / "output")
+    return tmp_path
+
+
+def exported_names(run_dirs):
+    with open(run_dirs / "output" / "businesses.json", encoding="utf-8") as f:
+        return [b["name"] for b in json.load(f)]
+
+
+def test_scrape_spills_and_recycles_over_ceiling(run_dirs, monkeypatch, caplog):
+    monkeypatch.setattr(maps_scraper, "process_tree_rss_mb", lambda pid=None: 900.0)
+    caplog.set_level(logging.INFO, logger="maps_scraper")
+    pages = []
+
+    def recycle_page(page):
+        pages.append(FakePage())
+        return pages[-1]
+
+    result = maps_scraper.scrape(
+        FakePage(), "pizza", "NYC", skip_emails=True, max_rss_mb=500, recycle_page=recycle_page
+    )
+
+    # One spill and recycle, then the ceiling is raised above the browser's own RSS
+    assert len(pages) == 1
+    assert pages[0].listeners == []
+    assert "spilling 1 records to disk" in caplog.text
+    assert "raising ceiling to 1156 MB" in caplog.text
+    assert result == []
+    assert exported_names(run_dirs) == ["Joe's Pizza", "Prince Street Pizza", "Lucali"]
+    assert os.listdir(run_dirs / "checkpoints") == []
+
+
+def test_scrape_stays_in_memory_under_ceiling(run_dirs, monkeypatch):
+    monkeypatch.setattr(maps_scraper, "process_tree_rss_mb", lambda pid=None: 100.0)
+    result = maps_scraper.scrape(
+        FakePage(), "pizza", "NYC", skip_emails=True, max_rss_mb=500,
+        recycle_page=lambda page: pytest.fail("recycled under the ceiling")
+    )
+    assert [b["name"] for b in result] == ["Joe's Pizza", "Prince Street Pizza", "Lucali"]
+
+
+def test_resume_reads_spilled_records_without_ceiling(run_dirs):
+    checkpoints = run_dirs / "checkpoints"
+    places = parse_places(SEARCH_RESPONSE)
+    spilled = dict(places[0], emails="joe@pizza.com")
+    SpillStore(str(checkpoints / "pizza_NYC.spill.sqlite"), key=business_key).extend([spilled])
+    save_checkpoint(str(checkpoints / "pizza_NYC.json"), [], 1)
+    save_places(str(checkpoints / "pizza_NYC.places.json"), places)
+
+    result = maps_scraper.scrape(FakePage(), "pizza", "NYC", skip_emails=True, resume=True)
+
+    assert result == []
+    assert exported_names(run_dirs) == ["Joe's Pizza", "Prince Street Pizza", "Lucali"]
+    with open(run_dirs / "output" / "businesses.json", encoding="utf-8") as f:
+        assert json.load(f)[0]["emails"] == "joe@pizza.com"
+    assert os.listdir(checkpoints) == []
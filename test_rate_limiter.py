@@ -0,0 +1,116 @@
+"""
+Tests for the adaptive token-bucket rate limiter
+"""
+
+import asyncio
+import json
+import time
+
+from rate_limiter import RateLimiter, TokenBucket, MAPS_TARGET, STATE_TTL, target_for_url, is_throttled
+
+
+def test_target_for_url():
+    assert target_for_url("https://www.google.com/maps") == MAPS_TARGET
+    assert target_for_url("https://www.example.com/contact") == "example.com"
+    assert target_for_url("https://maps.google.co.uk/maps/place/x") == MAPS_TARGET
+    assert target_for_url("/maps/place/Joe's+Pizza") == MAPS_TARGET
+
+
+def test_target_for_schemeless_url():
+    assert target_for_url("joespizzanyc.com") == "joespizzanyc.com"
+    assert target_for_url("www.lucali.com") == "lucali.com"
+    assert target_for_url("lucali.com:8080/menu") == "lucali.com"
+    assert target_for_url("google.example.com") == "google.example.com"
+    assert target_for_url("www.google.com") == MAPS_TARGET
+
+
+def test_is_throttled():
+    assert is_throttled(status=429)
+    assert is_throttled("https://www.google.com/sorry/index?continue=x")
+    assert is_throttled("https://consent.google.com/ml?continue=x")
+    assert is_throttled(content="Our systems have detected unusual traffic")
+    assert not is_throttled("https://example.com", "<html>hello</html>", 200)
+
+
+def test_bucket_spaces_requests():
+    bucket = TokenBucket(rate=2.0)
+    assert bucket.reserve(100.0) == 0.0
+    assert bucket.reserve(100.0) == 0.5
+    assert bucket.reserve(100.0) == 1.0
+    assert bucket.achieved_rate() == 2.0
+
+
+def test_bucket_adapts_rate():
+    bucket = TokenBucket(rate=1.0, min_rate=0.2, max_rate=1.5)
+    bucket.backoff()
+    assert bucket.rate == 0.5
+    for _ in range(5):
+        bucket.recover()
+    assert bucket.rate == 0.55
+    for _ in range(10):
+        bucket.backoff()
+    assert bucket.rate == 0.2
+
+
+def test_limiter_per_target_buckets():
+    limiter = RateLimiter(default_rate=1000.0, rates={MAPS_TARGET: 0.5})
+    limiter.acquire("example.com")
+    assert limiter.reserve(MAPS_TARGET) == 0.0
+    assert limiter.reserve(MAPS_TARGET) > 1.0
+    assert asyncio.run(limiter.acquire_async("example.com")) < 0.01
+    assert set(limiter.stats()) == {MAPS_TARGET, "example.com"}
+
+
+def test_limiter_shares_state_file(tmp_path):
+    state_file = str(tmp_path / "rate_limits.json")
+    first = RateLimiter(default_rate=1.0, state_file=state_file)
+    second = RateLimiter(default_rate=1.0, state_file=state_file)
+    first.reserve(MAPS_TARGET)
+    first.report(MAPS_TARGET, throttled=True)
+    assert second.reserve(MAPS_TARGET) > 0
+    # Stats stay per limiter, only the budget is shared
+    assert second.stats()[MAPS_TARGET]["requests"] == 1
+    assert second.stats()[MAPS_TARGET]["rate_limit"] == 0.5
+
+
+def test_state_file_seeds_from_configured_rate(tmp_path):
+    state_file = tmp_path / "rate_limits.json"
+    state_file.write_text(json.dumps({
+        MAPS_TARGET: {"rate": 4.0, "tokens": 1.0, "updated": time.time()}
+    }))
+    limiter = RateLimiter(rates={MAPS_TARGET: 2.0}, state_file=str(state_file))
+    limiter.reserve(MAPS_TARGET)
+    assert limiter.stats()[MAPS_TARGET]["rate_limit"] == 2.0
+
+
+def test_state_file_budgets_expire(tmp_path):
+    state_file = tmp_path / "rate_limits.json"
+    state_file.write_text(json.dumps({
+        MAPS_TARGET: {"rate": 0.125, "tokens": -1.0, "updated": time.time() - STATE_TTL - 1},
+        "example.com": {"rate": 0.125, "tokens": -1.0, "updated": time.time()},
+    }))
+    limiter = RateLimiter(rates={MAPS_TARGET: 2.0}, state_file=str(state_file))
+    assert limiter.reserve(MAPS_TARGET) == 0.0
+    assert limiter.stats()[MAPS_TARGET]["rate_limit"] == 2.0
+    # Other targets' budgets are left alone
+    assert json.loads(state_file.read_text())["example.com"]["rate"] == 0.125
+
+
+def test_retry_action_backs_off_only_on_throttle():
+    from maps_scraper import retry_action
+    from rate_limiter import ThrottledError
+
+    limiter = RateLimiter(default_rate=1000.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TimeoutError("slow website")
+        if len(attempts) == 2:
+            raise ThrottledError("https://www.google.com/sorry/index")
+        return "ok"
+
+    assert retry_action(flaky, delay=0, limiter=limiter, target="example.com") == "ok"
+    assert limiter.stats()["example.com"]["throttled"] == 1
+    assert limiter.stats()["example.com"]["rate_limit"] == 500.0
@@ -0,0 +1,214 @@
+"""
+Tests for the warm browser session pool, using fake Playwright objects
+"""
+
+import pytest
+
+import session_pool
+from session_pool import SessionPool, MAPS_URL
+
+
+class FakeButton:
+    def __init__(self, page):
+        self.page = page
+
+    def click(self):
+        self.page.url = MAPS_URL
+
+
+class FakePage:
+    def __init__(self, consent=False):
+        self.url = "about:blank"
+        self.closed = False
+        self.healthy = True
+        self.visits = 0
+        self.consent = consent
+
+    def goto(self, url, timeout=None):
+        self.url = "https://consent.google.com/ml?continue=" + url if self.consent else url
+        self.visits += 1
+        return None
+
+    def query_selector(self, selector):
+        return FakeButton(self) if "consent" in self.url else None
+
+    def wait_for_url(self, pattern, timeout=None):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    def evaluate(self, script):
+        if not self.healthy:
+            raise RuntimeError("Target crashed")
+        return "complete"
+
+
+class FakeContext:
+    def __init__(self, storage_state=None, consent=False):
+        self.storage_state_path = storage_state
+        self.closed = False
+        self.page = None
+        self.consent = consent
+        self.saved = 0
+
+    def new_page(self):
+        self.page = FakePage(self.consent)
+        return self.page
+
+    def storage_state(self, path):
+        self.saved += 1
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{}")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, consent=False):
+        self.contexts = []
+        self.closed = False
+        self.consent = consent
+
+    def new_context(self, storage_state=None):
+        # Contexts without saved consent cookies land on the consent page
+        context = FakeContext(storage_state, consent=self.consent and storage_state is None)
+        self.contexts.append(context)
+        return context
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowserType:
+    def __init__(self, consent=False):
+        self.launches = 0
+        self.consent = consent
+
+    def launch(self, **kwargs):
+        self.launches += 1
+        return FakeBrowser(self.consent)
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    """Settable fake RSS reading"""
+    reading = {"mb": 100.0}
+    monkeypatch.setattr(session_pool, "process_tree_rss_mb", lambda pid=None: reading["mb"])
+    return reading
+
+
+def test_session_reuses_warm_page(rss):
+    pool = SessionPool(FakeBrowserType(), max_queries=5)
+    with pool.session() as first:
+        assert first.url == MAPS_URL
+    with pool.session() as second:
+        assert second is first
+    assert pool.created == 1
+    assert pool.recycled == 0
+
+
+def test_reused_page_is_reset_to_maps(rss):
+    pool = SessionPool(FakeBrowserType(), max_queries=5)
+    with pool.session() as page:
+        page.url = MAPS_URL + "/search/pizza+in+NYC"
+    with pool.session() as again:
+        assert again is page
+        assert again.url == MAPS_URL
+        assert again.visits == 2
+
+
+def test_recycles_after_max_queries(rss):
+    pool = SessionPool(FakeBrowserType(), max_queries=2)
+    for _ in range(2):
+        with pool.session() as page:
+            pass
+    context = pool.browser.contexts[0]
+    assert context.closed
+    assert pool.recycled == 1
+
+    with pool.session() as fresh:
+        assert fresh is not page
+    assert pool.created == 2
+
+
+def test_recycles_over_rss_threshold(rss):
+    pool = SessionPool(FakeBrowserType(), max_rss_mb=500)
+    rss["mb"] = 800.0
+    with pool.session():
+        pass
+    assert pool.browser.contexts[0].closed
+    assert pool.recycled == 1
+
+
+def test_discards_unhealthy_context(rss):
+    pool = SessionPool(FakeBrowserType()).start()
+    pool.browser.contexts[0].page.healthy = False
+    with pool.session() as page:
+        assert page is pool.browser.contexts[1].page
+    assert pool.browser.contexts[0].closed
+    assert pool.recycled == 1
+
+
+def test_recycle_swaps_borrowed_page(rss):
+    pool = SessionPool(FakeBrowserType(), max_queries=5)
+    with pool.session() as page:
+        fresh = pool.recycle(page)
+        assert fresh is not page
+        assert fresh.url == MAPS_URL
+        assert pool.browser.contexts[0].closed
+    # The swapped-in context goes back to the pool
+    with pool.session() as again:
+        assert again is fresh
+
+
+def test_storage_state_persisted_and_reused(rss, tmp_path):
+    state_file = str(tmp_path / "storage_state.json")
+    pool = SessionPool(FakeBrowserType(), max_queries=1, storage_state_file=state_file)
+    with pool.session():
+        pass
+    with pool.session():
+        pass
+    assert pool.browser.contexts[0].storage_state_path is None
+    assert pool.browser.contexts[1].storage_state_path == state_file
+
+
+def test_stats(rss, monkeypatch):
+    clock = iter([10.0, 12.5, 20.0, 20.5])
+    monkeypatch.setattr(session_pool.time, "time", lambda: next(clock))
+    pool = SessionPool(FakeBrowserType(), max_queries=5)
+    with pool.session():
+        rss["mb"] = 300.0
+    with pool.session():
+        rss["mb"] = 250.0
+
+    stats = pool.stats()
+    assert stats["queries"] == 2
+    assert stats["contexts_created"] == 1
+    assert stats["contexts_recycled"] == 0
+    assert stats["last_startup_seconds"] == 0.5
+    assert stats["avg_startup_seconds"] == 1.5
+    assert stats["steady_rss_mb"] == 250.0
+    assert stats["peak_rss_mb"] == 300.0
+
+
+def test_close_shuts_browser(rss):
+    pool = SessionPool(FakeBrowserType()).start()
+    browser = pool.browser
+    pool.close()
+    assert browser.closed
+    assert browser.contexts[0].closed
+    assert pool.browser is None
+
+
+def test_accepts_consent_and_saves_state(rss, tmp_path):
+    state_file = str(tmp_path / "storage_state.json")
+    pool = SessionPool(FakeBrowserType(consent=True), max_queries=1, storage_state_file=state_file)
+    with pool.session() as page:
+        assert page.url == MAPS_URL
+        assert pool.browser.contexts[0].saved == 1
+    # The next context starts from the saved consent cookies
+    with pool.session() as page:
+        assert page.url == MAPS_URL
+        assert not pool.browser.contexts[1].page.consent
@@ -28,6 +28,10 @@ def test_file_structure():
     files = [
         'app.py',
         'maps_scraper.py',
+        'rate_limiter.py',
+        'session_pool.py',
+        'maps_network.py',
+        'spill_store.py',
         'templates/index.html',
         'requirements.txt',
         'README.md'
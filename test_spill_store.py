@@ -0,0 +1,47 @@
+"""
+Tests for the on-disk spill store used on memory-bounded runs
+"""
+
+from spill_store import SpillStore
+
+
+def key(business):
+    return (business["name"].lower(), business["phone"])
+
+
+def test_store_round_trip(tmp_path):
+    store = SpillStore(str(tmp_path / "run.spill.sqlite"), key=key)
+    records = [{"name": f"Shop {i}", "phone": str(i), "emails": "N/A"} for i in range(3)]
+    store.extend(records)
+    store.extend([{"name": "Café ☕", "phone": "9", "emails": "N/A"}])
+    assert len(store) == 4
+    assert list(store) == records + [{"name": "Café ☕", "phone": "9", "emails": "N/A"}]
+
+
+def test_groups_in_first_seen_order(tmp_path):
+    store = SpillStore(str(tmp_path / "run.spill.sqlite"), key=key)
+    store.extend([
+        {"name": "B", "phone": "1", "emails": "b@shop.com"},
+        {"name": "A", "phone": "2", "emails": "N/A"},
+    ])
+    store.extend([
+        {"name": "b", "phone": "1", "emails": "info@shop.com"},
+        {"name": "C", "phone": "3", "emails": "N/A"},
+    ])
+    groups = list(store.groups())
+    assert [[r["emails"] for r in group] for group in groups] == [
+        ["b@shop.com", "info@shop.com"], ["N/A"], ["N/A"]
+    ]
+    assert [group[0]["name"] for group in groups] == ["B", "A", "C"]
+
+
+def test_reopen_and_remove(tmp_path):
+    path = tmp_path / "run.spill.sqlite"
+    store = SpillStore(str(path), key=key)
+    store.extend([{"name": "A", "phone": "1"}])
+    store.close()
+
+    store = SpillStore(str(path), key=key)
+    assert len(store) == 1
+    store.remove()
+    assert not path.exists()